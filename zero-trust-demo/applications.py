@@ -1,5 +1,8 @@
 class ApplicationManager:
-    def __init__(self):
+    def __init__(self, applications=None):
+        if applications is not None:
+            self.applications = applications
+            return
         self.applications = {
             "hr_system": {
                 "name": "Human Resources Portal",
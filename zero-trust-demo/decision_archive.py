@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Columnar Decision Archive
+Append-only, compressed storage for access decisions with fast aggregate queries
+"""
+
+import os
+import json
+import time
+import zlib
+import struct
+from array import array
+from collections import Counter
+from itertools import compress
+
+RISK_LEVELS = ["low", "medium", "high", "unknown"]
+
+# (column name, array typecode); string columns hold dictionary codes
+COLUMNS = [
+    ("timestamp", "q"),
+    ("granted", "B"),
+    ("risk", "B"),
+    ("user", "I"),
+    ("app", "I"),
+    ("location", "I"),
+    ("reason", "I")
+]
+DICTIONARY_COLUMNS = ["user", "app", "location", "reason"]
+
+_HEADER = struct.Struct("<I")
+_INVERT = bytes([1, 0]) + bytes(254)
+
+class _Dictionary:
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+class _Block:
+    """One chunk of rows; columns are decompressed only when a query asks for them"""
+
+    def __init__(self, rows, stats, blobs=None, arrays=None, source=None):
+        self.rows = rows
+        self.stats = stats
+        self.blobs = blobs or {}
+        self.arrays = arrays
+        self.source = source
+
+    def column(self, name):
+        if self.arrays is not None:
+            return self.arrays[name]
+        blob = self.blobs[name]
+        if isinstance(blob, tuple):
+            blob = self.source.read_blob(*blob)
+        values = array(dict(COLUMNS)[name])
+        values.frombytes(zlib.decompress(blob))
+        return values
+
+    def may_contain(self, name, low, high):
+        column_min, column_max = self.stats[name]
+        return column_max >= low and column_min <= high
+
+class DecisionArchive:
+    def __init__(self, path=None, block_size=65536):
+        self.path = path
+        self.block_size = block_size
+        self.dictionaries = {name: _Dictionary() for name in DICTIONARY_COLUMNS}
+        self.blocks = []
+        # Blocks examined and ruled out by min/max statistics in the most recent query
+        self.last_scan = {"blocks": 0, "skipped": 0}
+        self._published = {name: 0 for name in DICTIONARY_COLUMNS}
+        self._reset_buffers()
+        self._file = None
+
+        if path is not None:
+            if os.path.exists(path):
+                self._load_existing()
+            self._file = open(path, "ab+")
+
+    def _reset_buffers(self):
+        self.buffers = {name: array(typecode) for name, typecode in COLUMNS}
+
+    def append(self, user_id, app_name, location, decision, timestamp=None):
+        """Append one decision as produced by ZeroTrustEngine or ZeroTrustSimulation"""
+        buffers = self.buffers
+        risk_level = decision.get("risk_level", "unknown")
+        buffers["timestamp"].append(int((time.time() if timestamp is None else timestamp) * 1000))
+        buffers["granted"].append(1 if decision["access_granted"] else 0)
+        buffers["risk"].append(RISK_LEVELS.index(risk_level) if risk_level in RISK_LEVELS else 3)
+        buffers["user"].append(self.dictionaries["user"].encode(user_id))
+        buffers["app"].append(self.dictionaries["app"].encode(app_name))
+        buffers["location"].append(self.dictionaries["location"].encode(location))
+        buffers["reason"].append(self.dictionaries["reason"].encode(decision.get("reason", "Policy evaluation")))
+
+        if len(buffers["timestamp"]) >= self.block_size:
+            self.flush()
+
+    def __len__(self):
+        return sum(block.rows for block in self.blocks) + len(self.buffers["timestamp"])
+
+    def flush(self):
+        """Seal buffered rows into a compressed block"""
+        rows = len(self.buffers["timestamp"])
+        if rows == 0:
+            return
+
+        stats = {name: [min(values), max(values)] for name, values in self.buffers.items()}
+        blobs = {name: zlib.compress(values.tobytes(), 6) for name, values in self.buffers.items()}
+
+        if self._file is None:
+            self.blocks.append(_Block(rows, stats, blobs=blobs))
+        else:
+            self.blocks.append(self._write_block(rows, stats, blobs))
+
+        self._reset_buffers()
+
+    def _write_block(self, rows, stats, blobs):
+        # Each block carries the dictionary entries added since the previous one,
+        # so the file stays append-only and can be replayed front to back
+        new_values = {}
+        for name in DICTIONARY_COLUMNS:
+            values = self.dictionaries[name].values
+            new_values[name] = values[self._published[name]:]
+            self._published[name] = len(values)
+
+        layout = {}
+        offset = 0
+        for name, _ in COLUMNS:
+            layout[name] = [offset, len(blobs[name])]
+            offset += len(blobs[name])
+
+        header = json.dumps({
+            "rows": rows, "stats": stats, "columns": layout, "new_values": new_values
+        }).encode()
+
+        self._file.seek(0, os.SEEK_END)
+        data_start = self._file.tell() + _HEADER.size + len(header)
+        self._file.write(_HEADER.pack(len(header)))
+        self._file.write(header)
+        for name, _ in COLUMNS:
+            self._file.write(blobs[name])
+        self._file.flush()
+
+        locations = {name: (data_start + start, length) for name, (start, length) in layout.items()}
+        return _Block(rows, stats, blobs=locations, source=self)
+
+    def _load_existing(self):
+        with open(self.path, "rb") as archive_file:
+            while True:
+                prefix = archive_file.read(_HEADER.size)
+                if len(prefix) < _HEADER.size:
+                    break
+                header = json.loads(archive_file.read(_HEADER.unpack(prefix)[0]))
+                data_start = archive_file.tell()
+
+                for name, values in header["new_values"].items():
+                    for value in values:
+                        self.dictionaries[name].encode(value)
+                    self._published[name] = len(self.dictionaries[name].values)
+
+                locations = {
+                    name: (data_start + start, length)
+                    for name, (start, length) in header["columns"].items()
+                }
+                self.blocks.append(_Block(header["rows"], header["stats"], blobs=locations, source=self))
+                archive_file.seek(data_start + sum(length for _, length in header["columns"].values()))
+
+    def read_blob(self, offset, length):
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _all_blocks(self):
+        yield from self.blocks
+        rows = len(self.buffers["timestamp"])
+        if rows:
+            stats = {name: [min(values), max(values)] for name, values in self.buffers.items()}
+            yield _Block(rows, stats, arrays=self.buffers)
+
+    def _scan(self, app=None, start=None, end=None, denied_only=False):
+        """Yield (block, row mask or None) for blocks the statistics cannot rule out"""
+        blocks = list(self._all_blocks())
+        scan = self.last_scan = {"blocks": len(blocks), "skipped": 0}
+        app_code = None
+        if app is not None:
+            app_code = self.dictionaries["app"].codes.get(app)
+            if app_code is None:
+                scan["skipped"] = len(blocks)
+                return
+        low = -2 ** 63 if start is None else int(start * 1000)
+        high = 2 ** 63 - 1 if end is None else int(end * 1000)
+
+        for block in blocks:
+            if (not block.may_contain("timestamp", low, high)
+                    or (app_code is not None and not block.may_contain("app", app_code, app_code))
+                    or (denied_only and block.stats["granted"][0] == 1)):
+                scan["skipped"] += 1
+                continue
+
+            mask = None
+            time_min, time_max = block.stats["timestamp"]
+            if time_min < low or time_max > high:
+                mask = bytes(low <= ts <= high for ts in block.column("timestamp"))
+            if app_code is not None and block.stats["app"] != [app_code, app_code]:
+                app_mask = bytes(code == app_code for code in block.column("app"))
+                mask = app_mask if mask is None else bytes(a & b for a, b in zip(mask, app_mask))
+            yield block, mask
+
+    def grant_deny_rates(self, app=None, start=None, end=None):
+        """Grant and deny counts/rates, optionally for one app and a time window (epoch seconds)"""
+        total = granted = 0
+        for block, mask in self._scan(app, start, end):
+            flags = block.column("granted")
+            if mask is not None:
+                flags = array("B", compress(flags, mask))
+            total += len(flags)
+            granted += flags.count(1)
+
+        denied = total - granted
+        return {
+            "total": total,
+            "granted": granted,
+            "denied": denied,
+            "grant_rate": granted / total if total else 0.0,
+            "deny_rate": denied / total if total else 0.0
+        }
+
+    def top_denial_reasons(self, limit=5, app=None, start=None, end=None):
+        """Most frequent denial reasons as (reason, count) pairs"""
+        counts = Counter()
+        for block, mask in self._scan(app, start, end, denied_only=True):
+            flags = block.column("granted")
+            reasons = block.column("reason")
+            if mask is not None:
+                flags = array("B", compress(flags, mask))
+                reasons = list(compress(reasons, mask))
+            counts.update(compress(reasons, flags.tobytes().translate(_INVERT)))
+
+        values = self.dictionaries["reason"].values
+        return [(values[code], count) for code, count in counts.most_common(limit)]
+
+    def app_breakdown(self, start=None, end=None):
+        """Per-application granted/denied counts and deny rate"""
+        counts = Counter()
+        for block, mask in self._scan(start=start, end=end):
+            apps = block.column("app")
+            flags = block.column("granted")
+            if mask is not None:
+                apps = compress(apps, mask)
+                flags = compress(flags, mask)
+            counts.update(zip(apps, flags))
+
+        breakdown = {}
+        values = self.dictionaries["app"].values
+        for (app_code, granted), count in counts.items():
+            entry = breakdown.setdefault(values[app_code], {"granted": 0, "denied": 0})
+            entry["granted" if granted else "denied"] += count
+        for entry in breakdown.values():
+            entry["total"] = entry["granted"] + entry["denied"]
+            entry["deny_rate"] = entry["denied"] / entry["total"]
+        return breakdown
+
+    def storage_bytes(self):
+        """Compressed size of sealed blocks"""
+        total = 0
+        for block in self.blocks:
+            for blob in block.blobs.values():
+                total += blob[1] if isinstance(blob, tuple) else len(blob)
+        return total
+
+def run_benchmark(total_decisions=5000000, block_size=65536):
+    """Fill an archive with synthetic decisions and time the aggregate queries"""
+    import random
+
+    rng = random.Random(42)
+    apps = ["hr_system", "financial_system", "intern_portal", "file_share"]
+    locations = ["office", "home_network", "public_wifi", "high_risk_country"]
+    decisions = [
+        {"access_granted": True, "reason": "All Zero Trust checks passed", "risk_level": "low"},
+        {"access_granted": True, "reason": "All Zero Trust checks passed", "risk_level": "medium"},
+        {"access_granted": False, "reason": "Device compliance check failed", "risk_level": "low"},
+        {"access_granted": False, "reason": "Access blocked from location: public_wifi", "risk_level": "low"},
+        {"access_granted": False, "reason": "Role intern not allowed for hr_system", "risk_level": "low"},
+        {"access_granted": False, "reason": "User authentication failed"}
+    ]
+
+    print("📦 DECISION ARCHIVE BENCHMARK")
+    print("=" * 50)
+
+    def fill(archive, app_for):
+        for n in range(total_decisions):
+            archive.append(
+                f"user{rng.randrange(50000)}", app_for(n), locations[rng.randrange(4)],
+                decisions[rng.randrange(len(decisions))], timestamp=base_time + n
+            )
+        archive.flush()
+
+    archive = DecisionArchive(block_size=block_size)
+    base_time = time.time() - total_decisions
+    start = time.perf_counter()
+    # Interleaved apps: every block holds every app, so only time ranges prune blocks
+    fill(archive, lambda n: apps[n % 4])
+    elapsed = time.perf_counter() - start
+
+    sample_json = len(json.dumps({
+        "timestamp": "2026-01-01T00:00:00.000000", "user_id": "user12345", "application": "hr_system",
+        "decision": "DENIED", "reason": "Device compliance check failed", "risk_level": "low"
+    }))
+    print(f"Decisions: {total_decisions:,}  Blocks: {len(archive.blocks)}")
+    print(f"   Ingest: {total_decisions / elapsed:,.0f} decisions/s")
+    print(f"   Compressed size: {archive.storage_bytes() / 1e6:.1f} MB "
+          f"(~{total_decisions * sample_json / 1e6:.0f} MB as JSON log lines)")
+
+    # App-clustered: each app's traffic arrives in block-sized bursts (e.g. one
+    # exporter per application flushing in turn), so app filters prune blocks too
+    clustered = DecisionArchive(block_size=block_size)
+    fill(clustered, lambda n: apps[n // block_size % 4])
+
+    window_start = base_time + total_decisions * 0.9
+    queries = [
+        ("grant/deny rates", archive, lambda: archive.grant_deny_rates()),
+        ("grant/deny rates, one app", archive, lambda: archive.grant_deny_rates(app="hr_system")),
+        ("grant/deny rates, last 10%", archive, lambda: archive.grant_deny_rates(start=window_start)),
+        ("top denial reasons", archive, lambda: archive.top_denial_reasons()),
+        ("per-app breakdown", archive, lambda: archive.app_breakdown()),
+        ("one app, app-clustered", clustered, lambda: clustered.grant_deny_rates(app="hr_system"))
+    ]
+    for name, queried, query in queries:
+        start = time.perf_counter()
+        query()
+        elapsed = time.perf_counter() - start
+        scan = queried.last_scan
+        print(f"   {name:<28} {elapsed * 1000:8.1f} ms  ({total_decisions / elapsed / 1e6:,.1f}M rows/s, "
+              f"{scan['skipped']}/{scan['blocks']} blocks skipped)")
+
+if __name__ == "__main__":
+    run_benchmark()
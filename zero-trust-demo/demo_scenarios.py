@@ -8,10 +8,12 @@ import time
 import json
 from datetime import datetime
 from main import ZeroTrustSimulation
+from decision_archive import DecisionArchive
 
 class DemoScenarios:
     def __init__(self):
         self.simulation = ZeroTrustSimulation()
+        self.simulation.decision_archive = DecisionArchive()
         self.scenario_results = []
     
     def run_comprehensive_demo(self):
@@ -268,6 +270,13 @@ class DemoScenarios:
         print(f"   • Location Policy Blocks: {self._count_blocks_by_reason('location')}")
         print(f"   • Risk Threshold Blocks: {self._count_blocks_by_reason('risk')}")
         
+        archive = self.simulation.decision_archive
+        print(f"\n📦 DECISION ARCHIVE ({len(archive)} decisions):")
+        for reason, count in archive.top_denial_reasons(limit=3):
+            print(f"   • {count}x {reason}")
+        for app, stats in sorted(archive.app_breakdown().items()):
+            print(f"   • {app}: {stats['granted']} granted, {stats['denied']} denied")
+        
         print(f"\n🎯 KEY ZERO TRUST DEMONSTRATIONS:")
         demonstrations = [
             "✓ Continuous verification across multiple dimensions",
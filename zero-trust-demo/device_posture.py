@@ -1,7 +1,17 @@
+import threading
 from datetime import datetime, timedelta
 
 class DevicePostureChecker:
-    def __init__(self):
+    def __init__(self, verbose=True, device_database=None):
+        self.verbose = verbose
+        self._write_lock = threading.Lock()
+        # Bumped on every update so snapshots of the tables can tell they are stale
+        self.generation = 0
+        # Called with the updated key after each update, outside the write lock
+        self.listeners = []
+        if device_database is not None:
+            self.device_database = device_database
+            return
         self.device_database = {
             "laptop-compliant": {
                 "encryption_enabled": True,
@@ -29,8 +39,11 @@ class DevicePostureChecker:
             }
         }
     
-    def check_device_compliance(self, device_id):
-        if device_id not in self.device_database:
+    def check_device_compliance(self, device_id, device_database=None):
+        # Records are replaced, never mutated, so one lookup is a consistent snapshot
+        device_database = self.device_database if device_database is None else device_database
+        device = device_database.get(device_id)
+        if device is None:
             return {
                 "compliant": False,
                 "risk_score": 100,
@@ -38,8 +51,8 @@ class DevicePostureChecker:
                 "last_check": datetime.now().isoformat()
             }
         
-        device = self.device_database[device_id]
         failed_checks = []
+        risk_score = device["risk_score"]
         
         if not device["encryption_enabled"]:
             failed_checks.append("disk_encryption")
@@ -53,21 +66,33 @@ class DevicePostureChecker:
         # Check if device seen recently
         if datetime.now() - device["last_seen"] > timedelta(days=7):
             failed_checks.append("device_inactive")
-            device["risk_score"] += 20
+            risk_score += 20
         
         is_compliant = len(failed_checks) == 0
         
         result = {
             "device_id": device_id,
             "compliant": is_compliant,
-            "risk_score": device["risk_score"] + (len(failed_checks) * 10),
+            "risk_score": risk_score + (len(failed_checks) * 10),
             "checks_failed": failed_checks,
             "last_check": datetime.now().isoformat()
         }
         
-        print(f"   📱 Device Posture: {device_id}")
-        print(f"      Compliant: {is_compliant}, Risk Score: {result['risk_score']}")
-        if failed_checks:
-            print(f"      Failed Checks: {', '.join(failed_checks)}")
+        if self.verbose:
+            print(f"   📱 Device Posture: {device_id}")
+            print(f"      Compliant: {is_compliant}, Risk Score: {result['risk_score']}")
+            if failed_checks:
+                print(f"      Failed Checks: {', '.join(failed_checks)}")
         
-        return result
\ No newline at end of file
+        return result
+    
+    def update_device(self, device_id, **facts):
+        """Atomically replace a device record with updated posture facts"""
+        with self._write_lock:
+            current = self.device_database.get(device_id)
+            if current is None:
+                raise KeyError(f"Unknown device: {device_id}")
+            self.device_database[device_id] = {**current, **facts}
+            self.generation += 1
+        for listener in self.listeners:
+            listener(device_id)
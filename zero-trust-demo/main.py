@@ -5,6 +5,7 @@ Fully functional demo showing risk-based access control
 """
 
 import time
+import threading
 import json
 from datetime import datetime
 from zero_trust_policy import ZeroTrustEngine
@@ -14,42 +15,50 @@ from applications import ApplicationManager
 from network_simulator import NetworkSimulator
 
 class ZeroTrustSimulation:
-    def __init__(self):
-        self.policy_engine = ZeroTrustEngine()
-        self.device_checker = DevicePostureChecker()
-        self.user_service = UserIdentityService()
-        self.app_manager = ApplicationManager()
-        self.network = NetworkSimulator()
+    def __init__(self, verbose=True, policy_engine=None, device_checker=None,
+                 user_service=None, app_manager=None, network=None):
+        self.verbose = verbose
+        self.policy_engine = policy_engine or ZeroTrustEngine(verbose=verbose)
+        self.device_checker = device_checker or DevicePostureChecker(verbose=verbose)
+        self.user_service = user_service or UserIdentityService(verbose=verbose)
+        self.app_manager = app_manager or ApplicationManager()
+        self.network = network or NetworkSimulator(verbose=verbose)
+        self.decision_archive = None
+        self.grant_registry = None
+        self.location_resolver = None
+        # Guards the optional archive; the decision path itself is lock-free
+        self._record_lock = threading.Lock()
         
-        print("🚀 Zero Trust Simulation Initialized")
-        print("=" * 50)
+        if self.verbose:
+            print("🚀 Zero Trust Simulation Initialized")
+            print("=" * 50)
     
-    def simulate_access_request(self, user_id, device_id, app_name, location="office"):
+    def simulate_access_request(self, user_id, device_id, app_name, location="office", client_ip=None):
         """Simulate a complete Zero Trust access request"""
-        print(f"\n🔍 Processing Access Request:")
-        print(f"   User: {user_id}")
-        print(f"   Device: {device_id}")
-        print(f"   Application: {app_name}")
-        print(f"   Location: {location}")
-        print("-" * 40)
+        # With a resolver attached the location comes from the client IP, never the caller
+        if self.location_resolver is not None:
+            location = self.location_resolver.resolve_location(client_ip)
+        
+        if self.verbose:
+            print(f"\n🔍 Processing Access Request:")
+            print(f"   User: {user_id}")
+            print(f"   Device: {device_id}")
+            print(f"   Application: {app_name}")
+            print(f"   Location: {location}")
+            print("-" * 40)
         
         # Step 1: Verify User Identity
         user_identity = self.user_service.verify_user(user_id)
         if not user_identity["authenticated"]:
-            return self._deny_access("User authentication failed")
+            decision = self._deny_access("User authentication failed")
+            self.record_decision(user_id, device_id, app_name, location, decision)
+            return decision
         
         # Step 2: Check Device Posture
         device_status = self.device_checker.check_device_compliance(device_id)
         
         # Step 3: Evaluate Risk Context
-        risk_context = {
-            "user_risk": user_identity["risk_score"],
-            "device_compliant": device_status["compliant"],
-            "device_risk": device_status["risk_score"],
-            "location": location,
-            "time_of_day": datetime.now().hour,
-            "threat_intel": self.network.check_threat_intelligence(user_id, device_id)
-        }
+        risk_context = self.build_risk_context(user_identity, device_status, user_id, device_id, location)
         
         # Step 4: Make Policy Decision
         policy_decision = self.policy_engine.evaluate_access(
@@ -58,9 +67,26 @@ class ZeroTrustSimulation:
         
         # Step 5: Log and Enforce
         self._log_access_attempt(user_id, app_name, policy_decision)
+        self.record_decision(user_id, device_id, app_name, location, policy_decision)
         
         return policy_decision
     
+    def table_generation(self):
+        """Changes whenever a policy, identity, posture or threat table is updated"""
+        return (self.policy_engine.generation, self.user_service.generation,
+                self.device_checker.generation, self.network.generation)
+    
+    def build_risk_context(self, user_identity, device_status, user_id, device_id, location,
+                           threat_intel_database=None):
+        return {
+            "user_risk": user_identity["risk_score"],
+            "device_compliant": device_status["compliant"],
+            "device_risk": device_status["risk_score"],
+            "location": location,
+            "time_of_day": datetime.now().hour,
+            "threat_intel": self.network.check_threat_intelligence(user_id, device_id, threat_intel_database)
+        }
+    
     def _deny_access(self, reason):
         decision = {
             "access_granted": False,
@@ -69,9 +95,22 @@ class ZeroTrustSimulation:
             "session_duration": 0,
             "timestamp": datetime.now().isoformat()
         }
-        print(f"❌ ACCESS DENIED: {reason}")
+        if self.verbose:
+            print(f"❌ ACCESS DENIED: {reason}")
         return decision
     
+    def record_decision(self, user_id, device_id, app_name, location, decision):
+        """Archive a decision and register it for re-evaluation if access was granted.
+
+        Called by simulate_access_request, and by engines that evaluate elsewhere
+        (e.g. sharded workers) so their decisions are recorded in this process.
+        """
+        if self.decision_archive is not None:
+            with self._record_lock:
+                self.decision_archive.append(user_id, app_name, location, decision)
+        if self.grant_registry is not None and decision["access_granted"]:
+            self.grant_registry.register(user_id, device_id, app_name, location, decision)
+    
     def _log_access_attempt(self, user_id, app_name, decision):
         log_entry = {
             "timestamp": datetime.now().isoformat(),
@@ -81,7 +120,8 @@ class ZeroTrustSimulation:
             "reason": decision.get("reason", "Policy evaluation"),
             "risk_level": decision.get("risk_level", "unknown")
         }
-        print(f"📝 Security Log: {json.dumps(log_entry, indent=2)}")
+        if self.verbose:
+            print(f"📝 Security Log: {json.dumps(log_entry, indent=2)}")
 
 def main():
     # Initialize the simulation
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Multi-Tenant Zero Trust Engine
+Thousands of isolated tenants sharing one copy of policy templates and app metadata
+"""
+
+import sys
+import copy
+import time
+import threading
+import tracemalloc
+from collections import ChainMap
+from types import MappingProxyType
+from datetime import datetime, timedelta
+from main import ZeroTrustSimulation
+
+# Low-cardinality record fields worth sharing across tenants; names and ids are not
+INTERNED_FIELDS = ("role", "department", "risk_factors")
+
+def intern_strings(value, table):
+    """Return value with every nested string replaced by its shared copy in table"""
+    if isinstance(value, str):
+        return table.setdefault(value, value)
+    if isinstance(value, dict):
+        return {intern_strings(key, table): intern_strings(item, table) for key, item in value.items()}
+    if isinstance(value, list):
+        return [intern_strings(item, table) for item in value]
+    if isinstance(value, tuple):
+        return tuple(intern_strings(item, table) for item in value)
+    return value
+
+class CopyOnWriteTable(ChainMap):
+    """Tenant view over a shared template; writes replace entries in tenant overrides"""
+
+    def __init__(self, template):
+        super().__init__({}, template)
+
+    @property
+    def overrides(self):
+        return self.maps[0]
+
+class Tenant:
+    """Tenant-scoped tables; policies and threats stay the shared templates until overridden"""
+    __slots__ = ("tenant_id", "policies", "users", "devices", "threats")
+
+    def __init__(self, tenant_id, policies, threats):
+        self.tenant_id = tenant_id
+        self.policies = policies
+        self.users = {}
+        self.devices = {}
+        self.threats = threats
+
+class MultiTenantEngine:
+    def __init__(self, policy_template=None, applications=None, threat_feed=None):
+        self.strings = {}
+        # One quiet simulation provides the stateless components for every tenant
+        self.simulation = ZeroTrustSimulation(verbose=False)
+        self.policy_template = MappingProxyType(intern_strings(
+            policy_template or self.simulation.policy_engine.policies, self.strings))
+        self.applications = MappingProxyType(intern_strings(
+            applications or self.simulation.app_manager.applications, self.strings))
+        self.threat_feed = MappingProxyType(intern_strings(
+            threat_feed or self.simulation.network.threat_intel_database, self.strings))
+        self.simulation.app_manager.applications = self.applications
+        self.tenants = {}
+        self._write_lock = threading.Lock()
+
+    def add_tenant(self, tenant_id, users=None, devices=None):
+        if tenant_id in self.tenants:
+            raise ValueError(f"Tenant {tenant_id} already exists")
+
+        tenant = Tenant(tenant_id, self.policy_template, self.threat_feed)
+        self.tenants[tenant_id] = tenant
+
+        for user_id, record in (users or {}).items():
+            self.add_user(tenant_id, user_id, record)
+        for device_id, record in (devices or {}).items():
+            self.add_device(tenant_id, device_id, record)
+        return tenant
+
+    def get_tenant(self, tenant_id):
+        if tenant_id not in self.tenants:
+            raise KeyError(f"Unknown tenant: {tenant_id}")
+        return self.tenants[tenant_id]
+
+    def _intern_record(self, record):
+        strings = self.strings
+        return {
+            strings.setdefault(key, key): intern_strings(value, strings) if key in INTERNED_FIELDS else value
+            for key, value in record.items()
+        }
+
+    def add_user(self, tenant_id, user_id, record):
+        self.get_tenant(tenant_id).users[user_id] = self._intern_record(record)
+
+    def add_device(self, tenant_id, device_id, record):
+        self.get_tenant(tenant_id).devices[device_id] = self._intern_record(record)
+
+    def override_policy(self, tenant_id, app_name, **settings):
+        """Change policy fields for one tenant without touching the shared template"""
+        tenant = self.get_tenant(tenant_id)
+        with self._write_lock:
+            if app_name not in tenant.policies:
+                raise KeyError(f"Unknown application: {app_name}")
+            if not isinstance(tenant.policies, CopyOnWriteTable):
+                tenant.policies = CopyOnWriteTable(self.policy_template)
+            tenant.policies[app_name] = {**tenant.policies[app_name], **intern_strings(settings, self.strings)}
+
+    def add_threat(self, tenant_id, category, value):
+        """Add a tenant-specific entry to a threat list, e.g. suspicious_users"""
+        tenant = self.get_tenant(tenant_id)
+        with self._write_lock:
+            if not isinstance(tenant.threats, CopyOnWriteTable):
+                tenant.threats = CopyOnWriteTable(self.threat_feed)
+            tenant.threats[category] = tenant.threats.get(category, []) + [value]
+
+    def evaluate(self, tenant_id, user_id, device_id, app_name, location="office", client_ip=None):
+        tenant = self.get_tenant(tenant_id)
+        simulation = self.simulation
+        # As in simulate_access_request, an attached resolver derives the location from the client IP
+        if simulation.location_resolver is not None:
+            location = simulation.location_resolver.resolve_location(client_ip)
+
+        user_identity = simulation.user_service.verify_user(user_id, user_database=tenant.users)
+        if not user_identity["authenticated"]:
+            return simulation._deny_access("User authentication failed")
+
+        device_status = simulation.device_checker.check_device_compliance(
+            device_id, device_database=tenant.devices)
+        risk_context = simulation.build_risk_context(
+            user_identity, device_status, user_id, device_id, location,
+            threat_intel_database=tenant.threats)
+        return simulation.policy_engine.evaluate_access(
+            user_identity, device_status, app_name, risk_context, policies=tenant.policies)
+
+    def memory_usage(self, tenant_id):
+        """Approximate bytes owned by one tenant, excluding objects shared with other tenants"""
+        shared = set()
+        for template in (self.policy_template, self.applications, self.threat_feed, self.strings):
+            _collect_ids(template, shared)
+        return _owned_size(self.get_tenant(tenant_id), shared, set())
+
+def _collect_ids(obj, ids):
+    if id(obj) in ids:
+        return
+    ids.add(id(obj))
+    if isinstance(obj, (dict, MappingProxyType)):
+        for key, value in obj.items():
+            _collect_ids(key, ids)
+            _collect_ids(value, ids)
+    elif isinstance(obj, (list, tuple, set)):
+        for item in obj:
+            _collect_ids(item, ids)
+
+def _owned_size(obj, shared, seen):
+    if id(obj) in shared or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, ChainMap):
+        size += _owned_size(obj.maps, shared, seen)
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _owned_size(key, shared, seen) + _owned_size(value, shared, seen)
+    elif isinstance(obj, (list, tuple, set)):
+        for item in obj:
+            size += _owned_size(item, shared, seen)
+    elif hasattr(obj, "__slots__"):
+        for name in obj.__slots__:
+            size += _owned_size(getattr(obj, name), shared, seen)
+    elif hasattr(obj, "__dict__"):
+        size += _owned_size(vars(obj), shared, seen)
+    return size
+
+def _sample_records(tenant_n, count):
+    users, devices = {}, {}
+    for n in range(count):
+        users[f"user{n}"] = {
+            "name": f"Tenant {tenant_n} User {n}",
+            "role": ["employee", "manager", "intern"][n % 3],
+            "department": "Engineering",
+            "trust_score": 0.9,
+            "last_login": datetime.now() - timedelta(hours=2),
+            "mfa_enabled": True,
+            "risk_factors": []
+        }
+        devices[f"laptop{n}"] = {
+            "encryption_enabled": True,
+            "firewall_active": True,
+            "antivirus_updated": True,
+            "os_patched": True,
+            "last_seen": datetime.now() - timedelta(hours=1),
+            "risk_score": 10
+        }
+    return users, devices
+
+def run_benchmark(tenant_count=5000, users_per_tenant=5):
+    """Compare memory of shared multi-tenant mode with one full simulation per tenant"""
+    print("🏢 MULTI-TENANT ENGINE BENCHMARK")
+    print("=" * 50)
+    print(f"Tenants: {tenant_count:,}  Users/devices per tenant: {users_per_tenant}")
+
+    records = [_sample_records(n, users_per_tenant) for n in range(tenant_count)]
+
+    tracemalloc.start()
+    naive = []
+    for users, devices in records:
+        simulation = ZeroTrustSimulation(verbose=False)
+        simulation.user_service.user_database.update(copy.deepcopy(users))
+        simulation.device_checker.device_database.update(copy.deepcopy(devices))
+        naive.append(simulation)
+    naive_bytes = tracemalloc.get_traced_memory()[0]
+    del naive
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    engine = MultiTenantEngine()
+    for n, (users, devices) in enumerate(records):
+        engine.add_tenant(f"tenant{n:05d}", copy.deepcopy(users), copy.deepcopy(devices))
+        if n % 10 == 0:
+            engine.override_policy(f"tenant{n:05d}", "hr_system", max_risk_score=40)
+    shared_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    empty_engine = MultiTenantEngine()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for n in range(tenant_count):
+        empty_engine.add_tenant(f"tenant{n:05d}")
+    empty_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    accounted = [engine.memory_usage(tenant_id) for tenant_id in engine.tenants]
+    print(f"   One simulation per tenant: {naive_bytes / 1e6:8.1f} MB ({naive_bytes / tenant_count:,.0f} B/tenant)")
+    print(f"   Multi-tenant engine:       {shared_bytes / 1e6:8.1f} MB ({shared_bytes / tenant_count:,.0f} B/tenant)")
+    print(f"   Empty tenant overhead:     {empty_bytes / tenant_count:8,.0f} B/tenant")
+    print(f"   Accounted per tenant: avg {sum(accounted) / len(accounted):,.0f} B, max {max(accounted):,} B")
+
+    start = time.perf_counter()
+    evaluations = 0
+    for n in range(tenant_count):
+        for u in range(users_per_tenant):
+            engine.evaluate(f"tenant{n:05d}", f"user{u}", f"laptop{u}", "intern_portal")
+            evaluations += 1
+    elapsed = time.perf_counter() - start
+    print(f"   Tenant-scoped evaluations: {evaluations / elapsed:,.0f} decisions/s")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,16 +1,28 @@
+import threading
+
 class NetworkSimulator:
-    def __init__(self):
+    def __init__(self, verbose=True, threat_intel_database=None):
+        self.verbose = verbose
+        self._write_lock = threading.Lock()
+        # Bumped on every update so snapshots of the tables can tell they are stale
+        self.generation = 0
+        # Called with (category, value) after each addition, outside the write lock
+        self.listeners = []
+        if threat_intel_database is not None:
+            self.threat_intel_database = threat_intel_database
+            return
         self.threat_intel_database = {
             "malicious_ips": ["192.168.1.100", "10.0.0.99"],
             "suspicious_users": ["hacker123"],
             "compromised_devices": ["device-malware-001"]
         }
     
-    def check_threat_intelligence(self, user_id, device_id):
+    def check_threat_intelligence(self, user_id, device_id, threat_intel_database=None):
         # Simulate threat intelligence lookup
+        threat_intel = self.threat_intel_database if threat_intel_database is None else threat_intel_database
         is_malicious = (
-            user_id in self.threat_intel_database["suspicious_users"] or
-            device_id in self.threat_intel_database["compromised_devices"]
+            user_id in threat_intel["suspicious_users"] or
+            device_id in threat_intel["compromised_devices"]
         )
         
         result = {
@@ -21,6 +33,15 @@ class NetworkSimulator:
         
         if is_malicious:
             result["threat_types"] = ["suspicious_activity", "potential_breach"]
-            print(f"   🚨 Threat Intel: MALICIOUS activity detected!")
+            if self.verbose:
+                print(f"   🚨 Threat Intel: MALICIOUS activity detected!")
         
-        return result
\ No newline at end of file
+        return result
+    
+    def add_threat(self, category, value):
+        """Publish a new threat list with value added, swapping it in atomically"""
+        with self._write_lock:
+            self.threat_intel_database[category] = self.threat_intel_database.get(category, []) + [value]
+            self.generation += 1
+        for listener in self.listeners:
+            listener(category, value)
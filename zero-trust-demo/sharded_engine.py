@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Sharded Zero Trust Decision Engine
+Spreads access requests across worker processes so decisions scale past one core
+"""
+
+import os
+import json
+import time
+import pickle
+import struct
+import zlib
+import queue
+import threading
+import multiprocessing as mp
+from array import array
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from datetime import datetime, timedelta
+from main import ZeroTrustSimulation
+from ip_location import IPLocationResolver
+
+# Entity records are fixed width so workers decode them straight from shared memory;
+# every string field is an index into the block's string dictionary
+_USER_RECORD = struct.Struct("<IIIddBI")   # name, role, department, trust_score, last_login, mfa_enabled, risk_factors
+_DEVICE_RECORD = struct.Struct("<BBBBdq")  # encryption, firewall, antivirus, os_patched, last_seen, risk_score
+_DIRECTORY_SIZE = struct.Struct("<I")
+_FACTOR_SEPARATOR = "\x1f"
+
+def _string_column(values):
+    """Offsets array, concatenated UTF-8 blob and open-addressing hash slots for strings"""
+    encoded = [value.encode() for value in values]
+    offsets = array("I", [0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+
+    # Power-of-two table at most half full; a slot holds row + 1, 0 marks it empty
+    capacity = 1
+    while capacity < 2 * len(encoded):
+        capacity *= 2
+    slots = array("I", [0]) * capacity
+    for row, value in enumerate(encoded):
+        slot = zlib.crc32(value) & (capacity - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (capacity - 1)
+        slots[slot] = row + 1
+    return offsets.tobytes(), b"".join(encoded), slots.tobytes()
+
+class _StringColumn:
+    """Strings stored as an offsets array and a UTF-8 blob, with a crc32 hash index.
+
+    crc32 rather than hash() because the index is built in one process and probed
+    in others, where str hashes are salted differently.
+    """
+
+    def __init__(self, offsets, blob, slots):
+        self.offsets = offsets
+        self.blob = blob
+        self.slots = slots
+        self.mask = len(slots) - 1
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]])
+
+    def text(self, index):
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def find(self, value):
+        """Row of value, or None"""
+        key = value.encode()
+        slots, offsets, mask = self.slots, self.offsets, self.mask
+        slot = zlib.crc32(key) & mask
+        while True:
+            row = slots[slot] - 1
+            if row < 0:
+                return None
+            if self.blob[offsets[row]:offsets[row + 1]] == key:
+                return row
+            slot = (slot + 1) & mask
+
+class _SharedStringSet:
+    """Membership test over a string column, e.g. one threat-intel list"""
+
+    def __init__(self, column):
+        self.column = column
+
+    def __contains__(self, value):
+        return self.column.find(value) is not None
+
+    def __len__(self):
+        return len(self.column)
+
+class _SharedRecordTable:
+    """Read-only mapping of ids to fixed-width records, decoded per lookup"""
+
+    def __init__(self, ids, records, strings):
+        self.ids = ids
+        self.records = records
+        self.strings = strings
+
+    def get(self, key, default=None):
+        index = self.ids.find(key)
+        if index is None:
+            return default
+        return self._decode(index)
+
+    def __getitem__(self, key):
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key):
+        return self.ids.find(key) is not None
+
+    def __len__(self):
+        return len(self.ids)
+
+class _SharedUserTable(_SharedRecordTable):
+    def _decode(self, index):
+        name, role, department, trust_score, last_login, mfa_enabled, risk_factors = \
+            _USER_RECORD.unpack_from(self.records, index * _USER_RECORD.size)
+        strings = self.strings
+        risk_factors = strings.text(risk_factors)
+        return {
+            "name": strings.text(name),
+            "role": strings.text(role),
+            "department": strings.text(department),
+            "trust_score": trust_score,
+            "last_login": datetime.fromtimestamp(last_login),
+            "mfa_enabled": bool(mfa_enabled),
+            "risk_factors": risk_factors.split(_FACTOR_SEPARATOR) if risk_factors else []
+        }
+
+class _SharedDeviceTable(_SharedRecordTable):
+    def _decode(self, index):
+        encryption, firewall, antivirus, patched, last_seen, risk_score = \
+            _DEVICE_RECORD.unpack_from(self.records, index * _DEVICE_RECORD.size)
+        return {
+            "encryption_enabled": bool(encryption),
+            "firewall_active": bool(firewall),
+            "antivirus_updated": bool(antivirus),
+            "os_patched": bool(patched),
+            "last_seen": datetime.fromtimestamp(last_seen),
+            "risk_score": risk_score
+        }
+
+class SharedTables:
+    """One generation of policy, threat-intel and entity tables published to shared memory.
+
+    Users, devices and threat lists are laid out as hash-indexed, dictionary-encoded
+    fixed-width arrays that workers probe and decode in place, so the entity
+    tables exist once no matter how many workers attach. Only the small policy
+    and application tables are unpickled per worker.
+    """
+
+    def __init__(self, simulation):
+        # Read first: an update racing the snapshot leaves the generation stale,
+        # which forces another publish on the next batch
+        self.generation = simulation.table_generation()
+        resolver = simulation.location_resolver
+        strings = {"": 0}
+
+        def code(value):
+            return strings.setdefault(value, len(strings))
+
+        sections = {}
+
+        def add_column(name, values):
+            sections[name + ".offsets"], sections[name], sections[name + ".slots"] = _string_column(values)
+
+        users = simulation.user_service.user_database
+        user_ids = list(users)
+        user_records = []
+        for user_id in user_ids:
+            user = users[user_id]
+            user_records.append(_USER_RECORD.pack(
+                code(user["name"]), code(user["role"]), code(user["department"]),
+                user["trust_score"], user["last_login"].timestamp(), user["mfa_enabled"],
+                code(_FACTOR_SEPARATOR.join(user["risk_factors"]))))
+        add_column("user_ids", user_ids)
+        sections["users"] = b"".join(user_records)
+
+        devices = simulation.device_checker.device_database
+        device_ids = list(devices)
+        device_records = []
+        for device_id in device_ids:
+            device = devices[device_id]
+            device_records.append(_DEVICE_RECORD.pack(
+                device["encryption_enabled"], device["firewall_active"], device["antivirus_updated"],
+                device["os_patched"], device["last_seen"].timestamp(), device["risk_score"]))
+        add_column("device_ids", device_ids)
+        sections["devices"] = b"".join(device_records)
+
+        threat_intel = simulation.network.threat_intel_database
+        for category in threat_intel:
+            add_column("threat:" + category, list(dict.fromkeys(threat_intel[category])))
+
+        add_column("strings", list(strings))
+        sections["small"] = pickle.dumps({
+            # Workers map the range table file themselves; only its settings travel
+            "location_resolver": resolver.settings() if resolver is not None else None,
+            "policies": simulation.policy_engine.policies,
+            "applications": simulation.app_manager.applications
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # [directory length][JSON directory of section offsets][8-byte aligned sections]
+        directory, body = {}, bytearray()
+        for name, data in sections.items():
+            body.extend(b"\0" * (-len(body) % 8))
+            directory[name] = [len(body), len(data)]
+            body.extend(data)
+        header = json.dumps(directory).encode()
+        base = _DIRECTORY_SIZE.size + len(header)
+        base += -base % 8
+
+        self.size = base + len(body)
+        self.shm = shared_memory.SharedMemory(create=True, size=self.size)
+        self.shm.buf[:_DIRECTORY_SIZE.size] = _DIRECTORY_SIZE.pack(len(header))
+        self.shm.buf[_DIRECTORY_SIZE.size:_DIRECTORY_SIZE.size + len(header)] = header
+        self.shm.buf[base:self.size] = body
+        self.name = self.shm.name
+
+    @staticmethod
+    def attach(name, size):
+        return _AttachedTables(name, size)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+class _AttachedTables:
+    """A worker's in-place view of one SharedTables block"""
+
+    def __init__(self, name, size):
+        self.shm = shared_memory.SharedMemory(name=name)
+        # Every view into the block is tracked so release() can unmap it cleanly
+        self._views = [self.shm.buf[:size]]
+        buffer = self._views[0]
+        header_size = _DIRECTORY_SIZE.unpack_from(buffer, 0)[0]
+        header_end = _DIRECTORY_SIZE.size + header_size
+        self._directory = json.loads(bytes(buffer[_DIRECTORY_SIZE.size:header_end]))
+        self._base = header_end + (-header_end % 8)
+
+        strings = self._column("strings")
+        self.users = _SharedUserTable(self._column("user_ids"), self._section("users"), strings)
+        self.devices = _SharedDeviceTable(self._column("device_ids"), self._section("devices"), strings)
+        self.threat_intel = {
+            name[len("threat:"):]: _SharedStringSet(self._column(name))
+            for name in self._directory
+            if name.startswith("threat:") and "." not in name
+        }
+        small = self._section("small")
+        settings = pickle.loads(small)
+        self.policies = settings["policies"]
+        self.applications = settings["applications"]
+        self.location_resolver = None
+        if settings["location_resolver"] is not None:
+            self.location_resolver = IPLocationResolver(**settings["location_resolver"])
+
+    def _section(self, name):
+        offset, length = self._directory[name]
+        start = self._base + offset
+        view = self._views[0][start:start + length]
+        self._views.append(view)
+        return view
+
+    def _column(self, name):
+        offsets = self._section(name + ".offsets").cast("I")
+        slots = self._section(name + ".slots").cast("I")
+        self._views.extend((offsets, slots))
+        return _StringColumn(offsets, self._section(name), slots)
+
+    def bind(self, simulation):
+        simulation.policy_engine.policies = self.policies
+        simulation.network.threat_intel_database = self.threat_intel
+        simulation.user_service.user_database = self.users
+        simulation.device_checker.device_database = self.devices
+        simulation.app_manager.applications = self.applications
+
+    def release(self):
+        if self.location_resolver is not None:
+            self.location_resolver.close()
+        for view in reversed(self._views):
+            view.release()
+        self.shm.close()
+
+def _receive_batches(conn, inbox):
+    while True:
+        message = conn.recv()
+        inbox.put(message)
+        if message is None:
+            break
+
+def _shard_worker(conn, tables_name, tables_size):
+    tables = SharedTables.attach(tables_name, tables_size)
+    simulation = ZeroTrustSimulation(verbose=False)
+    tables.bind(simulation)
+
+    # Drain the pipe on a separate thread so the parent can queue the next batch
+    # while this one is evaluated without either side blocking on a full pipe
+    inbox = queue.Queue()
+    threading.Thread(target=_receive_batches, args=(conn, inbox), daemon=True).start()
+
+    while True:
+        message = inbox.get()
+        if message is None:
+            break
+        if isinstance(message, tuple):
+            # ("tables", name, size): switch to a newer generation, then acknowledge
+            # so the parent knows the previous block is no longer mapped here
+            previous, tables = tables, SharedTables.attach(*message[1:])
+            tables.bind(simulation)
+            previous.release()
+            conn.send([])
+            continue
+        # The location actually used travels back so the parent can archive and
+        # register the decision exactly as simulate_access_request would in-process
+        resolver = tables.location_resolver
+        results = []
+        for index, request in message:
+            user_id, device_id, app_name, location = request[:4]
+            if resolver is not None:
+                location = resolver.resolve_location(request[4] if len(request) > 4 else None)
+            decision = simulation.simulate_access_request(user_id, device_id, app_name, location)
+            results.append((index, decision, location))
+        conn.send(results)
+
+    tables.release()
+    conn.close()
+
+class ShardedDecisionEngine:
+    """Evaluates access requests on a pool of processes, partitioned by user id.
+
+    Table updates made through update_device, update_user, update_policy and
+    add_threat bump the simulation's table generation; each evaluate_batch call
+    republishes the tables first if the generation moved, so workers never
+    decide against data the in-process path has already replaced.
+    """
+
+    def __init__(self, simulation=None, workers=None, batch_size=512, batches_in_flight=2):
+        self.simulation = simulation or ZeroTrustSimulation(verbose=False)
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batches_in_flight = batches_in_flight
+        self.tables = None
+        self.processes = []
+        self.connections = []
+
+    def start(self):
+        self.tables = SharedTables(self.simulation)
+        for _ in range(self.workers):
+            parent_conn, child_conn = mp.Pipe()
+            process = mp.Process(
+                target=_shard_worker,
+                args=(child_conn, self.tables.name, self.tables.size),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self.processes.append(process)
+            self.connections.append(parent_conn)
+        return self
+
+    def shard_for(self, user_id):
+        # crc32 rather than hash() so the partitioning is stable across runs
+        return zlib.crc32(user_id.encode()) % self.workers
+
+    def evaluate_batch(self, requests):
+        """Evaluate (user_id, device_id, app_name, location[, client_ip]) tuples, preserving input order.
+
+        When the simulation has a location_resolver, workers derive the location
+        from client_ip exactly as simulate_access_request does in-process. Decisions
+        are archived and granted ones registered with the simulation's
+        decision_archive and grant_registry, as in-process. Updates
+        made while a call is running take effect from the next call.
+        """
+        if not self.processes:
+            self.start()
+
+        shards = [[] for _ in range(self.workers)]
+        for index, request in enumerate(requests):
+            shards[self.shard_for(request[0])].append((index, tuple(request)))
+
+        pending = {}
+        for shard_id, shard in enumerate(shards):
+            pending[self.connections[shard_id]] = [
+                shard[start:start + self.batch_size]
+                for start in range(0, len(shard), self.batch_size)
+            ]
+
+        # Several batches per worker overlap pipe transfer with evaluation
+        results = [None] * len(requests)
+        outstanding = {conn: 0 for conn in self.connections}
+
+        retired = None
+        if self.simulation.table_generation() != self.tables.generation:
+            retired, self.tables = self.tables, SharedTables(self.simulation)
+            for conn in self.connections:
+                conn.send(("tables", self.tables.name, self.tables.size))
+                outstanding[conn] += 1
+
+        for conn, batches in pending.items():
+            while batches and outstanding[conn] < self.batches_in_flight:
+                conn.send(batches.pop(0))
+                outstanding[conn] += 1
+
+        # Workers have no archive or registry; decisions are recorded here instead
+        record = self.simulation.record_decision
+        in_flight = [conn for conn, count in outstanding.items() if count]
+        while in_flight:
+            for conn in wait(in_flight):
+                for index, decision, location in conn.recv():
+                    results[index] = decision
+                    user_id, device_id, app_name = requests[index][:3]
+                    record(user_id, device_id, app_name, location, decision)
+                outstanding[conn] -= 1
+                if pending[conn]:
+                    conn.send(pending[conn].pop(0))
+                    outstanding[conn] += 1
+                elif not outstanding[conn]:
+                    in_flight.remove(conn)
+
+        # Every worker has acknowledged the new generation, so the old block can go
+        if retired is not None:
+            retired.close()
+        return results
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join(timeout=5)
+        self.processes = []
+        self.connections = []
+        if self.tables:
+            self.tables.close()
+            self.tables = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def build_benchmark_simulation(user_count=10000):
+    """Populate a quiet simulation with a synthetic user and device fleet"""
+    simulation = ZeroTrustSimulation(verbose=False)
+    roles = ["employee", "manager", "intern"]
+
+    for n in range(user_count):
+        simulation.user_service.user_database[f"user{n:06d}"] = {
+            "name": f"Synthetic User {n}",
+            "role": roles[n % len(roles)],
+            "department": "Engineering",
+            "trust_score": 0.6 + (n % 5) * 0.1,
+            "last_login": datetime.now() - timedelta(hours=n % 48),
+            "mfa_enabled": n % 4 != 0,
+            "risk_factors": ["new_account"] if n % 10 == 0 else []
+        }
+        simulation.device_checker.device_database[f"device{n:06d}"] = {
+            "encryption_enabled": n % 7 != 0,
+            "firewall_active": True,
+            "antivirus_updated": n % 11 != 0,
+            "os_patched": True,
+            "last_seen": datetime.now() - timedelta(hours=n % 150),
+            "risk_score": 10
+        }
+
+    return simulation
+
+def build_benchmark_requests(total_requests, user_count):
+    apps = ["hr_system", "financial_system", "intern_portal"]
+    locations = ["office", "home_network", "public_wifi", "high_risk_country"]
+    return [
+        (f"user{n % user_count:06d}", f"device{(n * 7) % user_count:06d}",
+         apps[n % len(apps)], locations[n % len(locations)])
+        for n in range(total_requests)
+    ]
+
+def run_benchmark(total_requests=200000, user_count=10000, max_workers=None):
+    """Compare single-process throughput with 1..N sharded workers"""
+    max_workers = max_workers or os.cpu_count() or 1
+    simulation = build_benchmark_simulation(user_count)
+    requests = build_benchmark_requests(total_requests, user_count)
+
+    print("⚡ SHARDED DECISION ENGINE BENCHMARK")
+    print("=" * 50)
+    print(f"Requests: {total_requests:,}  Users: {user_count:,}  Cores: {os.cpu_count()}")
+
+    start = time.perf_counter()
+    baseline = [simulation.simulate_access_request(*request) for request in requests]
+    elapsed = time.perf_counter() - start
+    baseline_rate = total_requests / elapsed
+    print(f"   In-process baseline: {baseline_rate:>12,.0f} decisions/s")
+
+    worker_counts = sorted({1, max_workers} | {n for n in (2, 4, 8, 16, 32) if n < max_workers})
+    for workers in worker_counts:
+        with ShardedDecisionEngine(simulation, workers=workers) as engine:
+            start = time.perf_counter()
+            results = engine.evaluate_batch(requests)
+            elapsed = time.perf_counter() - start
+
+        in_order = all(
+            result["access_granted"] == expected["access_granted"] and result["reason"] == expected["reason"]
+            for result, expected in zip(results, baseline)
+        )
+        rate = total_requests / elapsed
+        print(f"   {workers:2d} worker(s):        {rate:>12,.0f} decisions/s  "
+              f"(x{rate / baseline_rate:.2f}, order preserved: {in_order})")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,7 +1,17 @@
+import threading
 from datetime import datetime, timedelta
 
 class UserIdentityService:
-    def __init__(self):
+    def __init__(self, verbose=True, user_database=None):
+        self.verbose = verbose
+        self._write_lock = threading.Lock()
+        # Bumped on every update so snapshots of the tables can tell they are stale
+        self.generation = 0
+        # Called with the updated key after each update, outside the write lock
+        self.listeners = []
+        if user_database is not None:
+            self.user_database = user_database
+            return
         self.user_database = {
             "employee245": {
                 "name": "Vivek Shasi",
@@ -32,16 +42,16 @@ class UserIdentityService:
             }
         }
     
-    def verify_user(self, user_id):
-        if user_id not in self.user_database:
+    def verify_user(self, user_id, user_database=None):
+        user_database = self.user_database if user_database is None else user_database
+        user = user_database.get(user_id)
+        if user is None:
             return {
                 "authenticated": False,
                 "risk_score": 100,
                 "reason": "User not found"
             }
         
-        user = self.user_database[user_id]
-        
         # Calculate risk score based on various factors
         risk_score = 0
         
@@ -72,7 +82,19 @@ class UserIdentityService:
             "last_login": user["last_login"].isoformat()
         }
         
-        print(f"   👤 User Identity: {user['name']} ({user['role']})")
-        print(f"      Trust Score: {user['trust_score']}, Risk Score: {risk_score}")
+        if self.verbose:
+            print(f"   👤 User Identity: {user['name']} ({user['role']})")
+            print(f"      Trust Score: {user['trust_score']}, Risk Score: {risk_score}")
         
-        return result
\ No newline at end of file
+        return result
+    
+    def update_user(self, user_id, **fields):
+        """Atomically replace a user record with updated fields"""
+        with self._write_lock:
+            current = self.user_database.get(user_id)
+            if current is None:
+                raise KeyError(f"Unknown user: {user_id}")
+            self.user_database[user_id] = {**current, **fields}
+            self.generation += 1
+        for listener in self.listeners:
+            listener(user_id)
@@ -1,8 +1,15 @@
+import threading
 from datetime import datetime
 
 class ZeroTrustEngine:
-    def __init__(self):
-        self.policies = self._load_policies()
+    def __init__(self, verbose=True, policies=None):
+        self.verbose = verbose
+        self._write_lock = threading.Lock()
+        # Bumped on every update so snapshots of the tables can tell they are stale
+        self.generation = 0
+        # Called with the updated key after each update, outside the write lock
+        self.listeners = []
+        self.policies = self._load_policies() if policies is None else policies
     
     def _load_policies(self):
         return {
@@ -11,7 +18,7 @@ class ZeroTrustEngine:
                 "require_device_compliance": True,
                 "allowed_roles": ["employee", "manager"],
                 "max_risk_score": 30,
-                "blocked_locations": ["high_risk_country"],
+                "blocked_locations": ["high_risk_country", "unknown"],
                 "require_mfa": True
             },
             "financial_system": {
@@ -19,7 +26,7 @@ class ZeroTrustEngine:
                 "require_device_compliance": True,
                 "allowed_roles": ["manager", "finance"],
                 "max_risk_score": 20,
-                "blocked_locations": ["high_risk_country", "public_wifi"],
+                "blocked_locations": ["high_risk_country", "public_wifi", "unknown"],
                 "require_mfa": True,
                 "time_restrictions": {"start": 6, "end": 18}
             },
@@ -32,12 +39,11 @@ class ZeroTrustEngine:
             }
         }
     
-    def evaluate_access(self, user_identity, device_status, app_name, risk_context):
-        if app_name not in self.policies:
+    def evaluate_access(self, user_identity, device_status, app_name, risk_context, policies=None):
+        policy = (self.policies if policies is None else policies).get(app_name)
+        if policy is None:
             return self._create_decision(False, f"Application {app_name} not found in policies")
         
-        policy = self.policies[app_name]
-        
         # Check user role
         if user_identity["role"] not in policy["allowed_roles"]:
             return self._create_decision(False, f"Role {user_identity['role']} not allowed for {app_name}")
@@ -73,6 +79,17 @@ class ZeroTrustEngine:
         # All checks passed - grant access with appropriate level
         return self._create_decision(True, "All Zero Trust checks passed", risk_level=total_risk)
     
+    def update_policy(self, app_name, **settings):
+        """Atomically replace one application's policy; readers never see a partial update"""
+        with self._write_lock:
+            current = self.policies.get(app_name)
+            if current is None:
+                raise KeyError(f"Unknown application: {app_name}")
+            self.policies[app_name] = {**current, **settings}
+            self.generation += 1
+        for listener in self.listeners:
+            listener(app_name)
+    
     def _create_decision(self, granted, reason, risk_level=0):
         risk_category = "low" if risk_level < 30 else "medium" if risk_level < 70 else "high"
         
@@ -85,9 +102,10 @@ class ZeroTrustEngine:
             "allowed_actions": ["read", "write"] if granted and risk_category == "low" else ["read"] if granted else []
         }
         
-        if granted:
-            print(f"✅ ACCESS GRANTED (Risk: {risk_category.upper()}): {reason}")
-        else:
-            print(f"❌ ACCESS DENIED: {reason}")
+        if self.verbose:
+            if granted:
+                print(f"✅ ACCESS GRANTED (Risk: {risk_category.upper()}): {reason}")
+            else:
+                print(f"❌ ACCESS DENIED: {reason}")
             
         return decision
\ No newline at end of file